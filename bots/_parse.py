@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+"""
+Lightweight parsers for engine response lines (no regex for speed/clarity).
+
+Parsers work on the raw bytes line; int()/float() accept bytes directly.
+Kept as a standalone plain-Python module with no BaseBot dependencies, so it can
+be compiled (e.g. cythonize of this .py file) and dropped in without touching callers.
+"""
+
+def parse_trailing_int(s: bytes, key: bytes) -> Optional[int]:
+    try:
+        idx = s.index(key)
+        num = s[idx + len(key):].strip(b",")
+        return int(num)
+    except Exception:
+        return None
+
+def parse_trade_line(s: bytes) -> Tuple[Optional[int], Optional[int], Optional[float], Optional[int]]:
+    # Expect: b"TRADE BuyID: X, SellID: Y, Price: P, Quantity: Q"
+    # One split; values sit at fixed positions behind their labels
+    parts = s.split()
+    if (len(parts) != 9 or parts[1] != b"BuyID:" or parts[3] != b"SellID:"
+            or parts[5] != b"Price:" or parts[7] != b"Quantity:"):
+        return None, None, None, None
+    try:
+        return (int(parts[2].rstrip(b",")), int(parts[4].rstrip(b",")),
+                float(parts[6].rstrip(b",")), int(parts[8]))
+    except ValueError:
+        return None, None, None, None
+
+def parse_market_trade_line(s: bytes) -> Tuple[Optional[float], Optional[int]]:
+    # Expect: b"MARKET TRADE Price: P, Quantity: Q"
+    parts = s.split()
+    if len(parts) != 6 or parts[2] != b"Price:" or parts[4] != b"Quantity:":
+        return None, None
+    try:
+        return float(parts[3].rstrip(b",")), int(parts[5])
+    except ValueError:
+        return None, None
@@ -0,0 +1,31 @@
+from typing import Tuple
+
+"""
+Quote math for MarketMakerBot, kept free of strings/objects so it can be
+compiled with Numba when it is installed (plain Python otherwise).
+"""
+
+try:
+    from numba import njit
+except ImportError: # numba is optional; fall back to the interpreted version
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+@njit(cache=True, fastmath=True)
+def compute_quote(mid: float, spread: float, inv: int, max_position: int) -> Tuple[float, float, bool, bool]:
+    """
+    Return (bid_px, ask_px, allow_bid, allow_ask) for the current inventory.
+    """
+    # simple inventory tilt, clamped to [-1, 1]
+    tilt = min(max(inv / max(1, max_position), -1.0), 1.0)
+    tilt_bp = 0.25 * spread * tilt # bias quotes when inventory is large
+    half = spread / 2.0
+    bid_px = max(0.01, mid - half + tilt_bp)
+    ask_px = max(bid_px + 0.01, mid + half + tilt_bp) # ensures ask > bid
+
+    # naive hard caps
+    allow_bid = inv < max_position
+    allow_ask = -inv < max_position
+    return bid_px, ask_px, allow_bid, allow_ask
@@ -1,8 +1,10 @@
 import asyncio
 import signal
+import socket
 import logging
 import argparse
-from typing import Optional, Tuple
+from typing import Optional, List
+from _parse import parse_trailing_int, parse_trade_line, parse_market_trade_line
 
 """
 BaseBot: Async TCP client for the C++ engine.
@@ -18,29 +20,69 @@ Protocol (current engine):
 Design:
 - Async line-based reader
 - Reconnect-on-failure (configurable)
+- One TCP session per bot. The engine replies CONFIRMED/TRADE to the sending session
+  and leaves it out of MARKET TRADE broadcasts, so bots can't share (pool) a socket
+  until the engine tags sessions per bot (e.g. a "BOTID:<x> " command prefix).
 - Hook methods you can override in subclasses:
     - on_connected / on_disconnected
     - on_confirm(order_id)
     - on_trade_fill(buy_id, sell_id, price, qty)
     - on_market_trade(price, qty)
     - on_invalid_input(line)
-    - on_raw(line)       # always called last
+    - on_welcome_message(text)   # once per connection, with the server banner
+    - on_raw(line)       # called last, with the raw bytes line (only when overridden or DEBUG is on)
 """
 
 DEFAULT_HOST = '127.0.0.1'
 DEFAULT_PORT = 12345
 RECONNECT_DELAY_SECS = 1.0
+FLUSH_THRESHOLD_BYTES = 64 * 1024 # flush inline once this much is pending
+SOCKET_BUF_BYTES = 4 * 1024 * 1024 # SO_SNDBUF / SO_RCVBUF size
+READ_CHUNK_BYTES = 64 * 1024 # max bytes per reader.read()
+READ_COMPACT_BYTES = 64 * 1024 # compact the read buffer once this much is consumed
+WELCOME_MAX_LINES = 64 # give up on an unterminated banner after this many lines
+
+# Connection state for incoming lines (one int, checked once per line)
+_STATE_WELCOME = 0 # waiting for the banner's opening "===" line
+_STATE_STEADY = 1 # handshake done: lines go straight to the dispatch table
+_STATE_BANNER = 2 # inside the banner, collecting lines
+
+# Pre-encoded command prefixes so orders are built straight into bytes
+_SIDE_PREFIX = {"BUY": b"BUY ", "SELL": b"SELL "}
 
 class BaseBot:
-    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, name: str = "bot"):
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, name: str = "bot", nodelay: bool = True):
         self.host = host
         self.port = port
         self.name = name
+        self.nodelay = nodelay
         self._reader: Optional[asyncio.StreamReader] = None
         self._writer: Optional[asyncio.StreamWriter] = None
         self._stop = asyncio.Event()
         self._connected = asyncio.Event()
         self._log = logging.getLogger(self.name)
+        # Hot-path debug logs check this cached flag (refreshed on every connect)
+        self._debug_on = self._log.isEnabledFor(logging.DEBUG)
+        # on_raw is opt-in: skip the per-line call unless a subclass overrides it
+        self._has_raw_hook = type(self).on_raw is not BaseBot.on_raw
+
+        # Outgoing lines are batched here and flushed by a single writer task
+        self._send_buf = bytearray()
+        self._flush_event = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Welcome banner ("===" ... "===") is handled once per connection, then skipped
+        self._state = _STATE_WELCOME
+        self._welcome_lines: List[bytes] = []
+
+        # First token of an incoming line (bytes) -> handler
+        self._dispatch = {
+            b"CONFIRMED": self._h_confirm,
+            b"TRADE": self._h_trade,
+            b"MARKET": self._h_market,
+            b"INVALID": self._h_invalid,
+            b"CANCELLED": self._h_cancelled,
+        }
 
     # ---------- Public API ----------
 
@@ -53,11 +95,18 @@ class BaseBot:
             try:
                 await self._connect()
                 await self.on_connected()
-                await self._read_loop() # returns when disconnected
+                await self._read_until_stopped() # returns when disconnected or stopped
             except asyncio.CancelledError:
                 raise
             except Exception as e:
                 self._log.exception("Exception in main loop: %s", e)
+
+            if self._stop.is_set():
+                # Graceful shutdown: push out anything still buffered before closing
+                try:
+                    await self.flush_now()
+                except ConnectionError as e:
+                    self._log.warning("Could not flush pending orders: %s", e)
             
             await self.on_disconnected()
             self._connected.clear()
@@ -72,29 +121,44 @@ class BaseBot:
             except asyncio.TimeoutError:
                 pass # loop and try to reconnect
 
-    async def stop(self) -> None:
+    def shutdown(self) -> None:
         """
         Signal graceful shutdown.
+        start() flushes anything still buffered, closes the socket and returns.
         """
         self._stop.set()
-        self._close_writer()
+
+    async def flush_now(self) -> None:
+        """
+        Write any buffered lines and drain immediately.
+        Use on latency-critical paths instead of waiting for the writer task.
+        """
+        if not self._send_buf or not self._writer:
+            return
+        data, self._send_buf = self._send_buf, bytearray()
+        self._writer.write(data)
+        await self._writer.drain()
 
     async def send_order(self, side: str, price: float, qty: int) -> None:
         """
         Send BUY/SELL order.
         Accepts int or float for price; formats with 2dp.
         """
-        if side.upper() not in ('BUY', 'SELL'):
-            raise ValueError("Invalid order side")
-        line = f"{side.upper()} {price:.2f} {qty}\n"
-        await self._send_line(line)
+        await self._send_line_bytes(order_line(side, price, qty))
 
     async def cancel_order(self, order_id: int) -> None:
         """
         Cancel an order by ID.
         """
-        line = f"CANCEL {order_id}\n"
-        await self._send_line(line)
+        await self._send_line_bytes(cancel_line(order_id))
+
+    async def send_burst(self, payload: bytes) -> None:
+        """
+        Send several pre-built lines (see order_line / cancel_line) joined into one payload.
+        Goes out together with anything already buffered in a single write + drain.
+        """
+        await self._send_line_bytes(payload)
+        await self.flush_now()
 
     # ---------- Overridable hooks ----------
 
@@ -119,11 +183,15 @@ class BaseBot:
     async def on_cancel(self, order_id: int) -> None:
         self._log.info("CANCELLED OrderID: %d", order_id)
 
-    async def on_raw(self, line: str) -> None:
+    async def on_welcome_message(self, text: str) -> None:
+        self._log.info("Welcome message received (%d lines)", text.count("\n") + 1)
+
+    async def on_raw(self, line: bytes) -> None:
         """
-        Called on specific handlers; useful for logging everything.
+        Called on specific handlers with the undecoded line; useful for logging everything.
         """
-        self._log.debug("RAW <- %s", line)
+        if self._debug_on:
+            self._log.debug("RAW <- %s", line)
 
     # ---------- Internals ----------
 
@@ -132,126 +200,229 @@ class BaseBot:
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
             try:
-                loop.add_signal_handler(sig, lambda: asyncio.create_task(self.stop()))
+                loop.add_signal_handler(sig, self.shutdown)
             except NotImplementedError:
                 # Windows may not support all signals
                 pass
     
     async def _connect(self) -> None:
         self._log.info("Connecting to %s:%d", self.host, self.port)
+        self._debug_on = self._log.isEnabledFor(logging.DEBUG)
         self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._state = _STATE_WELCOME
+        self._welcome_lines = []
+        self._tune_socket()
+        self._writer_task = asyncio.create_task(self._writer_loop())
         self._connected.set()
     
+    def _tune_socket(self) -> None:
+        # Disable Nagle so single order lines aren't held back waiting on delayed ACKs,
+        # and enlarge kernel buffers so bursts don't stall on a full window.
+        # TCP_NODELAY is always written: asyncio already turns it on, so nodelay=False must clear it.
+        sock = self._writer.get_extra_info("socket") if self._writer else None
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if self.nodelay else 0)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUF_BYTES)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUF_BYTES)
+        except OSError as e:
+            self._log.warning("Could not tune socket options: %s", e)
+
     async def _send_line(self, line: str) -> None:
-        await self._connected.wait()
+        await self._send_line_bytes(line.encode("utf-8"))
+
+    async def _send_line_bytes(self, line: bytes) -> None:
+        if not self._connected.is_set():
+            # Only park on the event while (re)connecting; the steady state skips the await
+            await self._connected.wait()
         if not self._writer:
             raise ConnectionError("Not connected to server")
-        self._log.debug("RAW -> %s", line.strip())
-        self._writer.write(line.encode("utf-8"))
-        await self._writer.drain()
+        if self._debug_on:
+            self._log.debug("RAW -> %s", line.rstrip())
+        self._send_buf += line
+        if len(self._send_buf) >= FLUSH_THRESHOLD_BYTES:
+            # Large backlog: apply backpressure on the caller
+            await self.flush_now()
+        else:
+            self._flush_event.set()
+
+    async def _writer_loop(self) -> None:
+        # Single writer: coalesces lines queued in the same loop tick into one write + drain
+        try:
+            while True:
+                await self._flush_event.wait()
+                self._flush_event.clear()
+                await asyncio.sleep(0) # let same-tick sends join the batch
+                await self.flush_now()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._log.warning("Writer loop stopped: %s", e)
+
+    async def _read_until_stopped(self) -> None:
+        # Run the read loop until the peer disconnects or shutdown() is called
+        read_task = asyncio.ensure_future(self._read_loop())
+        stop_task = asyncio.ensure_future(self._stop.wait())
+        try:
+            await asyncio.wait({read_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_task.cancel()
+            if not read_task.done():
+                read_task.cancel()
+                try:
+                    await read_task
+                except asyncio.CancelledError:
+                    pass
+        if not read_task.cancelled():
+            read_task.result() # re-raise read errors into start()
 
     async def _read_loop(self) -> None:
         if not self._reader:
             raise RuntimeError("Not connected")
+        # One read() can carry many lines: scan the chunk for newlines from where the
+        # last scan stopped (never from the start of a partial line) and hand out
+        # each line as a single copy out of the shared buffer.
+        buf = bytearray()
+        start = 0 # first byte of the current (incomplete) line
+        scan = 0 # where to resume searching for b"\n"
         while not self._stop.is_set():
-            line = await self._reader.readline()
-            if not line:
+            chunk = await self._reader.read(READ_CHUNK_BYTES)
+            if not chunk:
                 break
-            text = line.decode("utf-8", errors="replace")
-            await self._dispatch_line(text)
+            buf += chunk
+            with memoryview(buf) as view:
+                while True:
+                    nl = buf.find(b"\n", scan)
+                    if nl < 0:
+                        scan = len(buf)
+                        break
+                    await self._dispatch_line(view[start:nl].tobytes())
+                    start = scan = nl + 1
+            # Compact consumed bytes (view released above, so buf may be resized)
+            if start == len(buf):
+                buf.clear()
+                start = scan = 0
+            elif start >= READ_COMPACT_BYTES:
+                del buf[:start]
+                scan -= start
+                start = 0
+        if start < len(buf):
+            # Trailing line without a newline at EOF
+            await self._dispatch_line(bytes(buf[start:]))
     
-    async def _dispatch_line(self, line: str) -> None:
+    async def _dispatch_line(self, line: bytes) -> None:
         s = line.strip()
         
         # Skip empty lines
         if not s:
             return
 
-        # Fast-path checks for protocol messages (order matters; keep conservative parsing)
-        if s.startswith("CONFIRMED"):
-            order_id = _parse_trailing_int(s, key="OrderID:")
-            if order_id is not None:
-                await self.on_confirm(order_id)
-            else:
-                await self.on_invalid_input(s)
-        
-        elif s.startswith("TRADE "):
-            buy_id, sell_id, price, qty = _parse_trade_line(s)
-            if None not in (buy_id, sell_id, price, qty):
-                await self.on_trade_fill(buy_id, sell_id, price, qty)
+        # Banner checks only run until the handshake completes
+        if self._state == _STATE_STEADY or not await self._h_welcome(s):
+            handler = self._dispatch.get(s.partition(b" ")[0])
+            if handler is not None:
+                await handler(s)
             else:
-                await self.on_invalid_input(s)
-        
-        elif s.startswith("MARKET TRADE"):
-            price, qty = _parse_market_trade_line(s)
-            if None not in (price, qty):
-                await self.on_market_trade(price, qty)
-            else:
-                await self.on_invalid_input(s)
-        
-        elif s.startswith("INVALID INPUT"):
-            await self.on_invalid_input(s)
+                await self._h_unknown(s)
 
-        elif s.startswith("CANCELLED"):
-            order_id = _parse_trailing_int(s, key="OrderID:")
-            if order_id is not None:
-                await self.on_cancel(order_id)
-            else:
-                await self.on_invalid_input(s)
+        # on_raw for full traceability (default one only logs at DEBUG)
+        if self._has_raw_hook or self._debug_on:
+            await self.on_raw(s)
+    
+    # ---------- Line handlers (selected by first token) ----------
 
+    async def _h_confirm(self, s: bytes) -> None:
+        order_id = parse_trailing_int(s, key=b"OrderID:")
+        if order_id is not None:
+            await self.on_confirm(order_id)
         else:
-            self._log.info("Unknown line: %s", s)
-        
-        # Always call on_raw for full traceability
-        await self.on_raw(s)
-    
+            await self.on_invalid_input(_decode(s))
+
+    async def _h_trade(self, s: bytes) -> None:
+        buy_id, sell_id, price, qty = parse_trade_line(s)
+        if None not in (buy_id, sell_id, price, qty):
+            await self.on_trade_fill(buy_id, sell_id, price, qty)
+        else:
+            await self.on_invalid_input(_decode(s))
+
+    async def _h_market(self, s: bytes) -> None:
+        if not s.startswith(b"MARKET TRADE"):
+            await self._h_unknown(s)
+            return
+        price, qty = parse_market_trade_line(s)
+        if None not in (price, qty):
+            await self.on_market_trade(price, qty)
+        else:
+            await self.on_invalid_input(_decode(s))
+
+    async def _h_invalid(self, s: bytes) -> None:
+        if s.startswith(b"INVALID INPUT"):
+            await self.on_invalid_input(_decode(s))
+        else:
+            await self._h_unknown(s)
+
+    async def _h_cancelled(self, s: bytes) -> None:
+        order_id = parse_trailing_int(s, key=b"OrderID:")
+        if order_id is not None:
+            await self.on_cancel(order_id)
+        else:
+            await self.on_invalid_input(_decode(s))
+
+    async def _h_welcome(self, s: bytes) -> bool:
+        """
+        Consume a welcome-banner line; returns False once the line is protocol traffic.
+        """
+        if s.startswith(b"="):
+            if self._state == _STATE_BANNER:
+                # closing "===" line
+                self._state = _STATE_STEADY
+                text = _decode(b"\n".join(self._welcome_lines))
+                self._welcome_lines = []
+                await self.on_welcome_message(text)
+            else:
+                self._state = _STATE_BANNER
+            return True
+        if self._state == _STATE_BANNER and len(self._welcome_lines) < WELCOME_MAX_LINES:
+            self._welcome_lines.append(s)
+            return True
+        # No banner (or it never terminated): treat everything from here on as protocol
+        self._state = _STATE_STEADY
+        self._welcome_lines = []
+        return False
+
+    async def _h_unknown(self, s: bytes) -> None:
+        # Slow path: anything that isn't a protocol message
+        self._log.info("Unknown line: %s", _decode(s))
+
     def _close_writer(self) -> None:
         try:
+            if self._writer_task:
+                self._writer_task.cancel()
             if self._writer:
                 self._writer.close()
         finally:
+            self._writer_task = None
             self._writer = None
             self._reader = None
+            self._send_buf = bytearray()
+            self._flush_event.clear()
 
-# ---------- Lightweight parsers (no regex for speed/clarity) ----------
+# ---------- Line builders ----------
 
-def _parse_trailing_int(s: str, key: str) -> Optional[int]:
-    try:
-        idx = s.index(key)
-        num = s[idx + len(key):].strip(",")
-        return int(num)
-    except Exception:
-        return None
+def order_line(side: str, price: float, qty: int) -> bytes:
+    # b"BUY <price> <qty>\n", price formatted with 2dp
+    prefix = _SIDE_PREFIX.get(side) or _SIDE_PREFIX.get(side.upper())
+    if prefix is None:
+        raise ValueError("Invalid order side")
+    return prefix + b"%.2f %d\n" % (price, qty)
 
-def _parse_float_field(s: str, key: str) -> Optional[float]:
-    try:
-        idx = s.index(key)
-        num = s[idx + len(key):].split(",")[0].strip()
-        return float(num)
-    except Exception:
-        return None
+def cancel_line(order_id: int) -> bytes:
+    return b"CANCEL %d\n" % order_id
 
-def _parse_int_field(s: str, key: str) -> Optional[int]:
-    try:
-        idx = s.index(key)
-        num = s[idx + len(key):].split(",")[0].strip()
-        return int(num)
-    except Exception:
-        return None
-
-def _parse_trade_line(s: str) -> Tuple[Optional[int], Optional[int], Optional[float], Optional[int]]:
-    # Expect: "TRADE BuyID: X, SellID: Y, Price: P, Quantity: Q"
-    buy_id = _parse_int_field(s, "BuyID:")
-    sell_id = _parse_int_field(s, "SellID:")
-    price = _parse_float_field(s, "Price:")
-    qty = _parse_int_field(s, "Quantity:")
-    return buy_id, sell_id, price, qty
-
-def _parse_market_trade_line(s: str) -> Tuple[Optional[float], Optional[int]]:
-    # Expect: "MARKET TRADE Price: P, Quantity: Q"
-    price = _parse_float_field(s, "Price:")
-    qty = _parse_int_field(s, "Quantity:")
-    return price, qty
+# Incoming lines stay bytes (see _parse.py); decode only on slow paths
+def _decode(s: bytes) -> str:
+    return s.decode("utf-8", errors="replace")
 
 # ---------- CLI runner (useful for quick manual testing) ----------
 
@@ -1,9 +1,9 @@
 import asyncio
 import logging
 import argparse
-from collections import deque
-from typing import Optional, Tuple, Deque
-from base_bot import BaseBot
+from typing import Optional, List
+from base_bot import BaseBot, order_line, cancel_line
+from _quote_math import compute_quote
 
 """
 MarketMakerBot:
@@ -11,6 +11,8 @@ MarketMakerBot:
 - Refreshes quotes on a timer.
 - Tracks inventory and simple P&L.
 - Optionally cancels prior quotes before re-quoting (requires server CANCEL support).
+- No locks: state mutation is always non-yielding. Handlers never await while
+  updating state, and _refresh_quotes finishes its bookkeeping before sending.
 
 Protocol assumptions (from engine):
 - "BUY <price> <qty>\n" / "SELL <price> <qty>\n"
@@ -20,6 +22,12 @@ Protocol assumptions (from engine):
 - Optional cancel: "CANCEL <id>\n"
 """
 
+# Side codes stored in the pending-confirm ring (0 = nothing pending)
+SIDE_BID = 1
+SIDE_ASK = 2
+PENDING_RING_SIZE = 64 # power of two: indices wrap with a mask
+_PENDING_RING_MASK = PENDING_RING_SIZE - 1
+
 class MarketMakerBot(BaseBot):
     def __init__(
         self,
@@ -50,8 +58,12 @@ class MarketMakerBot(BaseBot):
         self._ask_order_id: Optional[int] = None
 
         # track which side we just sent to map CONFIRMED -> order_id
-        self._pending_confirms: Deque[str] = deque()
-        self._lock = asyncio.Lock()
+        # fixed-size ring buffer, so quoting allocates nothing per cycle
+        self._pending_sides: List[int] = [0] * PENDING_RING_SIZE
+        self._pc_head = 0
+        self._pc_tail = 0
+        self._pc_count = 0
+        self._quoting_in_flight = False
 
     # ---------- lifecycle ----------
 
@@ -62,29 +74,27 @@ class MarketMakerBot(BaseBot):
     # ---------- incoming events ----------
 
     async def on_confirm(self, order_id: int) -> None:
-        async with self._lock:
-            side = self._pending_confirms.popleft() if self._pending_confirms else None
-            if side == "BID":
-                self._bid_order_id = order_id
-                self._log.info("QUOTE CONFIRMED BidId: %d", order_id)
-            elif side == "ASK":
-                self._ask_order_id = order_id
-                self._log.info("QUOTE CONFIRMED AskId: %d", order_id)
-            else:
-                self._log.info("QUOTE CONFIRMED (unmapped) id: %d", order_id)
+        side = self._pop_pending()
+        if side == SIDE_BID:
+            self._bid_order_id = order_id
+            self._log.info("QUOTE CONFIRMED BidId: %d", order_id)
+        elif side == SIDE_ASK:
+            self._ask_order_id = order_id
+            self._log.info("QUOTE CONFIRMED AskId: %d", order_id)
+        else:
+            self._log.info("QUOTE CONFIRMED (unmapped) id: %d", order_id)
     
     async def on_trade_fill(self, buy_id: int, sell_id: int, price: float, qty: int) -> None:
-        async with self._lock:
-            # Our fills: adjust inventory and cash
-            if self._bid_order_id == buy_id:
-                self._inv += qty
-                self._cash -= price * qty
-            elif self._ask_order_id == sell_id:
-                self._inv -= qty
-                self._cash += price * qty
-            self._last_trade = price
-            self._log.info("FILL @ %.2f x %d | inv=%d PnL=%.2f",
-                           price, qty, self._inv, self.mark_to_market())
+        # Our fills: adjust inventory and cash
+        if self._bid_order_id == buy_id:
+            self._inv += qty
+            self._cash -= price * qty
+        elif self._ask_order_id == sell_id:
+            self._inv -= qty
+            self._cash += price * qty
+        self._last_trade = price
+        self._log.info("FILL @ %.2f x %d | inv=%d PnL=%.2f",
+                       price, qty, self._inv, self.mark_to_market())
     
     async def on_market_trade(self, price: float, qty: int) -> None:
         # use EMA of last market trades to drift mid slowly
@@ -97,50 +107,86 @@ class MarketMakerBot(BaseBot):
     # ---------- quoting loop ----------
 
     async def _run(self):
+        # Fixed-rate cadence: each tick is due one interval after the previous *due* time,
+        # so time spent refreshing doesn't accumulate as drift.
+        loop = asyncio.get_running_loop()
+        next_due = loop.time()
         while not self._stop.is_set():
             try:
                 await self._refresh_quotes()
-                await asyncio.sleep(self.refresh_ms / 1000.0)
             except Exception as e:
                 self._log.exception("Quote loop error: %s", e)
 
+            next_due += self.refresh_ms / 1000.0
+            now = loop.time()
+            if next_due < now:
+                next_due = now # fell behind: skip missed ticks instead of bursting
+            await asyncio.sleep(next_due - now)
+
     async def _refresh_quotes(self):
-        async with self._lock:
+        if self._quoting_in_flight:
+            return
+        self._quoting_in_flight = True
+        try:
             self._log.info("Refreshing quotes...")
             # 1. cancel existing quotes (optional)
+            cancel_ids = []
             if self.use_cancel:
                 if self._bid_order_id is not None:
-                    await self.cancel_order(self._bid_order_id)
+                    cancel_ids.append(self._bid_order_id)
                     self._bid_order_id = None
                 if self._ask_order_id is not None:
-                    await self.cancel_order(self._ask_order_id)
+                    cancel_ids.append(self._ask_order_id)
                     self._ask_order_id = None
-            
-            # 2. compute target bid/ask with simple inventory tilt
-            tilt = min(max(self._inv / max(1, self.max_position), -1.0), 1.0)
-            tilt_bp = 0.25 * self.spread * tilt # bias quotes when inventory is large
-            half = self.spread / 2.0
-            bid_px = max(0.01, self.mid - half + tilt_bp)
-            ask_px = max(bid_px + 0.01, self.mid + half + tilt_bp) # ensures ask > bid
 
-            # 3. place fresh quotes, respecting position limits
-            place_bid, place_ask = self._position_allows()
+            # 2. compute target bid/ask with simple inventory tilt + position limits
+            bid_px, ask_px, place_bid, place_ask = compute_quote(
+                self.mid, self.spread, self._inv, self.max_position)
 
+            # 3. place fresh quotes where allowed
             if place_bid:
-                await self.send_order("BUY", bid_px, self.qty)
-                self._pending_confirms.append("BID")
+                self._push_pending(SIDE_BID)
             if place_ask:
-                await self.send_order("SELL", ask_px, self.qty)
-                self._pending_confirms.append("ASK")
+                self._push_pending(SIDE_ASK)
+
+            # All state above is updated before the first await
+            await self._send_quotes(cancel_ids,
+                                    bid_px if place_bid else None,
+                                    ask_px if place_ask else None)
 
             self._log.info("QUOTED bid=%.2f ask=%.2f inv=%d PnL=%.2f",
                            bid_px, ask_px, self._inv, self.mark_to_market())
-
-    def _position_allows(self) -> Tuple[bool, bool]:
-        # naive hard caps
-        allow_bid = self._inv < self.max_position
-        allow_ask = -self._inv < self.max_position
-        return allow_bid, allow_ask
+        finally:
+            self._quoting_in_flight = False
+
+    async def _send_quotes(self, cancel_ids: List[int], bid_px: Optional[float], ask_px: Optional[float]):
+        # cancels + bid + ask are joined into one payload: a single write/drain
+        lines = [cancel_line(order_id) for order_id in cancel_ids]
+        if bid_px is not None:
+            lines.append(order_line("BUY", bid_px, self.qty))
+        if ask_px is not None:
+            lines.append(order_line("SELL", ask_px, self.qty))
+        if lines:
+            await self.send_burst(b"".join(lines))
+
+    # ---------- pending confirm ring ----------
+
+    def _push_pending(self, side: int) -> None:
+        if self._pc_count == PENDING_RING_SIZE:
+            # engine is far behind; drop the oldest so the newest quotes still map
+            self._log.warning("Pending confirm ring full; dropping oldest entry")
+            self._pop_pending()
+        self._pending_sides[self._pc_tail] = side
+        self._pc_tail = (self._pc_tail + 1) & _PENDING_RING_MASK
+        self._pc_count += 1
+
+    def _pop_pending(self) -> int:
+        if not self._pc_count:
+            return 0
+        side = self._pending_sides[self._pc_head]
+        self._pc_head = (self._pc_head + 1) & _PENDING_RING_MASK
+        self._pc_count -= 1
+        return side
 
     # ---------- metrics ----------
 
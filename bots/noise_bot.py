@@ -4,13 +4,23 @@ import random
 import argparse
 from base_bot import BaseBot
 
+try:
+    import numpy as np
+except ImportError: # numpy is optional; fall back to the stdlib RNG
+    np = None
+
 """
 NoiseBot:
 - Inherits BaseBot
 - Generates random BUY/SELL orders around a configurable mid price
 - Random sleep between orders to simulate chaotic market flow
+- Random draws are pre-generated: gaussians in a ring (vectorised with NumPy
+  when available), side/quantity/sleep peeled off a shared 64-bit word
 """
 
+GAUSS_RING_SIZE = 65536 # standard normals (numpy); two are consumed per order
+GAUSS_FALLBACK_SIZE = 1024 # stdlib refill: small, so one refill never stalls the event loop
+
 class NoiseBot(BaseBot):
     def __init__(
         self,
@@ -32,36 +42,83 @@ class NoiseBot(BaseBot):
         self.sleep_min_ms = sleep_min_ms
         self.sleep_max_ms = sleep_max_ms
 
+        # Pre-drawn randomness (each source refilled when exhausted):
+        # - standard-normal ring for price noise and the mid random walk
+        # - 64-bit word of random bits for side (1 bit), quantity and sleep
+        self._rng = np.random.default_rng() if np is not None else None
+        self._gauss = []
+        self._gauss_idx = 0 # empty ring: forces a refill on first use
+        self._bits = 0
+        self._bits_left = 0
+
     async def on_connected(self):
         await super().on_connected()
         asyncio.create_task(self._order_loop())
     
+    def _refill_gauss(self) -> None:
+        if self._rng is not None:
+            self._gauss = self._rng.standard_normal(GAUSS_RING_SIZE).tolist()
+        else:
+            # random.gauss costs the same drawn early or late; only batch a little
+            self._gauss = [random.gauss(0.0, 1.0) for _ in range(GAUSS_FALLBACK_SIZE)]
+        self._gauss_idx = 0
+
+    def _take_bits(self, k: int) -> int:
+        # Peel k bits off the current 64-bit word, drawing a new word when it runs dry
+        if self._bits_left < k:
+            self._bits = random.getrandbits(64)
+            self._bits_left = 64
+        v = self._bits & ((1 << k) - 1)
+        self._bits >>= k
+        self._bits_left -= k
+        return v
+
+    def _draw_int(self, lo: int, hi: int) -> int:
+        """
+        Uniform int in [lo, hi] from the bit word.
+        Non power-of-two spans reject out-of-range draws instead of using %, so there is no bias.
+        """
+        span = hi - lo + 1
+        if span <= 0:
+            raise ValueError("empty range (%d, %d)" % (lo, hi))
+        k = (span - 1).bit_length()
+        while True:
+            v = self._take_bits(k)
+            if v < span:
+                return lo + v
+
     async def _order_loop(self):
         """
         Continuously send random orders until stopped.
         """
         while not self._stop.is_set():
+            if self._gauss_idx >= len(self._gauss):
+                self._refill_gauss()
+            g = self._gauss_idx
+            self._gauss_idx = g + 2
+
             # Pick a side
-            side = random.choice(['BUY', 'SELL'])
+            is_buy = self._take_bits(1)
+            side = "BUY" if is_buy else "SELL"
 
             # Pick a price: mid ± spread/2 + small noise
-            base_price = self.mid + ((self.spread / 2) if side == "BUY" else -(self.spread / 2))
-            noisy_price = base_price + random.gauss(0, self.sigma)
+            base_price = self.mid + ((self.spread / 2) if is_buy else -(self.spread / 2))
+            noisy_price = base_price + self.sigma * self._gauss[g]
 
             # Clamp price
             price = max(0.01, noisy_price)
 
             # Pick a quantity
-            qty = random.randint(self.qty_min, self.qty_max)
+            qty = self._draw_int(self.qty_min, self.qty_max)
 
             # Send the order
             await self.send_order(side, price, qty)
 
             # Random walk mid to simulate market movement
-            self.mid += random.gauss(0, self.sigma / 4)
+            self.mid += (self.sigma / 4) * self._gauss[g + 1]
 
             # Sleep for a random duration
-            sleep_time = random.randint(self.sleep_min_ms, self.sleep_max_ms)
+            sleep_time = self._draw_int(self.sleep_min_ms, self.sleep_max_ms)
             await asyncio.sleep(sleep_time / 1000)
 
 def _build_arg_parser():